@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import asyncio
 import warnings
@@ -10,6 +11,10 @@ from openai.types.beta.threads import Message
 from mcp.client.sse import sse_client
 from mcp import ClientSession
 
+# rollups.py fica na raiz do projeto (o chat roda como `python chatbot/main.py`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rollups import client_key
+
 # Suprime warnings de deprecação do OpenAI
 warnings.filterwarnings("ignore", message=".*The Assistants API is deprecated.*")
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -77,11 +82,13 @@ class MCPSSEClient:
         
         # 1. Análise básica de gastos vs renda
         situacao = self.client_data['situacao_financeira']
+        client_id = client_key(self.client_data)
         help_result = await self.session.call_tool("help_template", {
             "balance_available": situacao['saldo_atual'],
             "last_month_amount": situacao['gastos_mes_passado'],
             "income": situacao['renda_mensal'],
-            "frequency": situacao['frequencia_pagamento']
+            "frequency": situacao['frequencia_pagamento'],
+            "client_id": client_id
         })
         
         if hasattr(help_result, 'content') and help_result.content:
@@ -90,6 +97,15 @@ class MCPSSEClient:
             over_expenses = str(help_result)
         
         analysis_results.append(f"📊 Análise de Gastos: {over_expenses}")
+
+        # 1.1 Tendência mensal (só existe se os extratos foram importados)
+        trend_result = await self.session.call_tool("tendencia_gastos", {
+            "client_id": client_id,
+            "months": 3
+        })
+        if not trend_result.isError and trend_result.content:
+            trend = getattr(trend_result.content[0], 'text', str(trend_result.content[0]))
+            analysis_results.append(f"📈 Tendência Mensal: {trend}")
         
         # 2. Análise de gastos surpresa
         if 'transacoes_recentes' in self.client_data:
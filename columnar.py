@@ -0,0 +1,64 @@
+"""
+Formato colunar compacto para enviar transações à ferramenta `surpresa_gastos_colunar`.
+
+Em vez de uma lista de dicts (que repete as chaves `id`, `amount`, `category` e
+`transacted_at` em cada linha), as transações viram listas paralelas:
+
+    {
+        "categories": ["Alimentação", "Transporte"],   # dicionário de categorias
+        "category_idx": [0, 1, 0],                     # índice em `categories`
+        "amounts": [120.0, 450.0, 90.0],
+        "days": [20089, 1, 1],                         # dias desde 1970-01-01
+        "delta_encoded": true                          # `days` guarda diferenças
+    }
+
+Com `delta_encoded`, o primeiro valor de `days` é absoluto e os seguintes são a
+diferença para o anterior, o que deixa os números pequenos quando as transações
+estão ordenadas por data.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List
+
+EPOCH = date(1970, 1, 1)
+
+
+def to_epoch_day(transacted_at: str) -> int:
+    """Converte um `transacted_at` ISO para o número de dias desde 1970-01-01."""
+    return (datetime.fromisoformat(transacted_at).date() - EPOCH).days
+
+
+def to_columnar(transactions: Iterable[Dict[str, Any]], delta_encoded: bool = True) -> Dict[str, Any]:
+    """
+    Converte uma lista de transações no formato colunar.
+
+    Com `delta_encoded`, as transações são ordenadas por data antes da codificação
+    (a ordem não altera o resultado de `surpresa_gastos`).
+    """
+    rows = [(to_epoch_day(tx["transacted_at"]), tx["category"], tx["amount"]) for tx in transactions]
+    if delta_encoded:
+        rows.sort(key=lambda row: row[0])
+
+    categories: List[str] = []
+    codigos: Dict[str, int] = {}
+    category_idx: List[int] = []
+    amounts: List[float] = []
+    days: List[int] = []
+    anterior = 0
+    for dia, categoria, valor in rows:
+        if categoria not in codigos:
+            codigos[categoria] = len(categories)
+            categories.append(categoria)
+        category_idx.append(codigos[categoria])
+        amounts.append(valor)
+        days.append(dia - anterior if delta_encoded else dia)
+        if delta_encoded:
+            anterior = dia
+
+    return {
+        "categories": categories,
+        "category_idx": category_idx,
+        "amounts": amounts,
+        "days": days,
+        "delta_encoded": delta_encoded,
+    }
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Importa extratos bancários (CSV, NDJSON ou OFX) para os dados do cliente do Fin-Bot.
+
+O arquivo é lido em streaming (um pipeline de geradores), cada linha é normalizada
+para o formato esperado por `surpresa_gastos`, transações repetidas são descartadas
+pelo `id` e o resultado é anexado em blocos a um histórico NDJSON ao lado de
+`client_data.json`. Os `id`s já importados ficam em um índice SQLite em disco e
+apenas as transações mais recentes são copiadas para `transacoes_recentes`, então
+a memória usada depende do tamanho do bloco, não do extrato nem do histórico.
+Os totais mensais por categoria em `rollups.json` são atualizados a cada bloco.
+
+Uso:
+    python import_statements.py extrato.csv
+    python import_statements.py extrato.ofx --client-data client_data.json --chunk-size 5000
+    python import_statements.py --reconstruir-rollups
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from rollups import MonthlyRollups, client_key, rollups_path
+
+# Categorias usadas pelo Fin-Bot e os nomes alternativos encontrados nos extratos
+CATEGORIAS = {
+    "Alimentação": ["alimentacao", "alimentos", "mercado", "supermercado", "restaurante", "food", "groceries"],
+    "Transporte": ["transporte", "combustivel", "uber", "taxi", "transport", "fuel"],
+    "Lazer": ["lazer", "entretenimento", "entertainment", "leisure"],
+    "Saúde": ["saude", "farmacia", "health", "pharmacy"],
+    "Educação": ["educacao", "escola", "cursos", "education"],
+    "Moradia": ["moradia", "aluguel", "condominio", "housing", "rent"],
+}
+CATEGORIA_PADRAO = "Outros"
+
+# Nomes de colunas aceitos para cada campo (CSV e NDJSON)
+COLUNAS = {
+    "id": ["id", "fitid", "identificador", "transaction_id"],
+    "amount": ["amount", "valor", "value"],
+    "category": ["category", "categoria"],
+    "transacted_at": ["transacted_at", "data", "date", "data_transacao", "posted_at"],
+    "description": ["description", "descricao", "memo", "historico", "name"],
+}
+
+# Convenção de sinal do extrato. Em "debito-negativo" (padrão dos bancos e do OFX)
+# valores negativos são gastos; em "debito-positivo" (formato de client_data.json)
+# valores positivos são gastos. Nos dois casos os créditos são descartados.
+SINAIS = ["debito-negativo", "debito-positivo"]
+
+FORMATOS_DATA = [
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+]
+
+
+def _sem_acentos(texto: str) -> str:
+    """Remove acentos e normaliza caixa para comparar nomes."""
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).strip().lower()
+
+
+_ALIASES_CATEGORIA = {
+    alias: categoria
+    for categoria, aliases in CATEGORIAS.items()
+    for alias in aliases
+}
+
+
+def normalize_category(raw: Optional[str]) -> str:
+    """Converte o nome de categoria do extrato para uma categoria do Fin-Bot."""
+    if not raw:
+        return CATEGORIA_PADRAO
+    return _ALIASES_CATEGORIA.get(_sem_acentos(raw), raw.strip() or CATEGORIA_PADRAO)
+
+
+def normalize_timestamp(raw: str) -> str:
+    """
+    Converte a data do extrato para o formato ISO em UTC usado em `transacted_at`
+    (ex: "2025-07-02T14:22:00Z"). Datas sem fuso são consideradas UTC.
+    """
+    raw = raw.strip()
+    # OFX: YYYYMMDD[HH[MM[SS]]][.XXX][-3:BRT]
+    match = re.fullmatch(r"(\d{8}(?:\d{2}){0,3})(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::\w+)?\])?", raw)
+    if match:
+        digits, offset = match.groups()
+        # Completa hora/minuto/segundo ausentes com zeros
+        dt = datetime.strptime(digits.ljust(14, "0"), "%Y%m%d%H%M%S")
+        if offset:
+            dt = dt.replace(tzinfo=timezone.utc) - timedelta(hours=float(offset))
+        return _iso_utc(dt)
+
+    try:
+        dt = datetime.fromisoformat(raw)
+    except ValueError:
+        for formato in FORMATOS_DATA:
+            try:
+                dt = datetime.strptime(raw, formato)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"Data inválida: {raw!r}")
+    return _iso_utc(dt)
+
+
+def _iso_utc(dt: datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_amount(raw: Any) -> float:
+    """
+    Aceita números e textos como "1.234,56", "1,234.56", "-1.234", "1234.56" ou "R$ 12,00".
+
+    O último separador ("," ou ".") é o decimal; o outro só é aceito como separador de
+    milhar em grupos de 3 dígitos. Um separador único seguido de exatamente 3 dígitos
+    ("1.234", "1,234") é de milhar. Qualquer outro formato levanta ValueError.
+    """
+    if isinstance(raw, bool):
+        raise ValueError(f"Valor inválido: {raw!r}")
+    if isinstance(raw, (int, float)):
+        valor = float(raw)
+    else:
+        texto = re.sub(r"[^\d,.\-]", "", str(raw))
+        negativo = texto.startswith("-")
+        corpo = texto[1:] if negativo else texto
+        if not re.fullmatch(r"\d(?:[\d,.]*\d)?", corpo):
+            raise ValueError(f"Valor inválido: {raw!r}")
+
+        separadores = [c for c in corpo if c in ",."]
+        inteiro, decimais, milhar = corpo, "", None
+        if separadores:
+            ultimo = separadores[-1]
+            outro = "," if ultimo == "." else "."
+            posicao = corpo.rfind(ultimo)
+            if outro in corpo:
+                inteiro, decimais, milhar = corpo[:posicao], corpo[posicao + 1:], outro
+            elif corpo.count(ultimo) > 1 or len(corpo) - posicao - 1 == 3:
+                milhar = ultimo
+            else:
+                inteiro, decimais = corpo[:posicao], corpo[posicao + 1:]
+        if milhar:
+            if not re.fullmatch(rf"[1-9]\d{{0,2}}(?:\{milhar}\d{{3}})+", inteiro):
+                raise ValueError(f"Valor inválido: {raw!r}")
+            inteiro = inteiro.replace(milhar, "")
+        if not inteiro.isdigit() or (decimais and not decimais.isdigit()):
+            raise ValueError(f"Valor inválido: {raw!r}")
+        valor = float(f"{'-' if negativo else ''}{inteiro}.{decimais or '0'}")
+    if not math.isfinite(valor):
+        raise ValueError(f"Valor inválido: {raw!r}")
+    return valor
+
+
+def _texto(valor: Any) -> Optional[str]:
+    """Converte campos escalares (ex: categoria numérica no NDJSON) para texto."""
+    if valor is None:
+        return None
+    if isinstance(valor, (dict, list)):
+        raise ValueError(f"Campo inválido: {valor!r}")
+    return str(valor)
+
+
+def _campo(row: Dict[str, Any], nome: str) -> Any:
+    for coluna in COLUNAS[nome]:
+        if row.get(coluna) not in (None, ""):
+            return row[coluna]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Leitores: cada um gera dicts "crus" com as colunas do arquivo de origem
+# ---------------------------------------------------------------------------
+
+def read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê um CSV linha a linha, detectando o separador (vírgula ou ponto e vírgula)."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        for row in csv.DictReader(f, dialect=dialeto):
+            yield {_sem_acentos(k): v for k, v in row.items() if k is not None}
+
+
+def read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê um arquivo NDJSON (um objeto JSON por linha)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                objeto = json.loads(linha)
+            except json.JSONDecodeError:
+                objeto = None
+            # Linha malformada vira uma linha vazia, contada como inválida em normalize_rows
+            yield {_sem_acentos(k): v for k, v in objeto.items()} if isinstance(objeto, dict) else {}
+
+
+OFX_BLOCO = 64 * 1024
+OFX_MAX_TAG = 64 * 1024
+
+
+def _ofx_tags(path: str) -> Iterator[tuple]:
+    """
+    Gera os pares (tag, valor) de um OFX lendo blocos de tamanho fixo, para que um OFX
+    em XML numa única linha não seja carregado inteiro. O trecho a partir do último
+    "<" de cada bloco (tag possivelmente incompleta) passa para o bloco seguinte.
+    """
+    resto = ""
+    with open(path, "r", encoding="latin-1") as f:
+        while True:
+            bloco = f.read(OFX_BLOCO)
+            texto = resto + bloco
+            if not bloco:
+                yield from re.findall(r"<(/?\w+)>([^<\r\n]*)", texto)
+                return
+            corte = texto.rfind("<")
+            if corte == -1 or re.search(r"[\r\n]", texto[corte:]):
+                # Nenhuma tag aberta no fim do bloco: tudo pode ser processado
+                corte = len(texto)
+            yield from re.findall(r"<(/?\w+)>([^<\r\n]*)", texto[:corte])
+            # Um valor enorme sem "<" nem quebra de linha é truncado para manter a memória limitada
+            resto = texto[corte:][:OFX_MAX_TAG]
+
+
+def read_ofx(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os blocos <STMTTRN> de um OFX (SGML ou XML) sem carregar o arquivo inteiro.
+    O `TRNAMT` sai com o sinal original (no OFX débitos são negativos).
+    """
+    atual: Optional[Dict[str, str]] = None
+    for tag, valor in _ofx_tags(path):
+        tag = tag.upper()
+        if tag == "STMTTRN":
+            atual = {}
+        elif tag == "/STMTTRN" and atual is not None:
+            yield {
+                "id": atual.get("FITID"),
+                "amount": atual.get("TRNAMT"),
+                "category": atual.get("CATEGORY"),
+                "transacted_at": atual.get("DTPOSTED"),
+                "description": atual.get("MEMO") or atual.get("NAME"),
+            }
+            atual = None
+        elif atual is not None and not tag.startswith("/"):
+            atual[tag] = valor.strip()
+
+
+LEITORES = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+    "jsonl": read_ndjson,
+    "ofx": read_ofx,
+}
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def normalize_rows(rows: Iterable[Dict[str, Any]], sinal: str = "debito-negativo", stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Converte linhas cruas para o formato de transação do Fin-Bot.
+
+    Débitos viram gastos com `amount` positivo conforme a convenção `sinal`; créditos
+    e valores zerados são descartados e contados em `stats["creditos"]`. Linhas sem
+    valor ou data, ou com valores que não podem ser interpretados, são descartadas e
+    contadas em `stats["invalidas"]`, sem interromper o import.
+    """
+    if sinal not in SINAIS:
+        raise ValueError(f"Convenção de sinal inválida: {sinal!r} (use {' ou '.join(SINAIS)})")
+    stats = stats if stats is not None else {}
+    for row in rows:
+        try:
+            valor_bruto = _campo(row, "amount")
+            data_bruta = _texto(_campo(row, "transacted_at"))
+            if valor_bruto is None or data_bruta is None:
+                raise ValueError("linha sem valor ou data")
+            amount = round(_parse_amount(valor_bruto), 2)
+            transacted_at = normalize_timestamp(data_bruta)
+            description = _texto(_campo(row, "description")) or ""
+            category = normalize_category(_texto(_campo(row, "category")))
+            tx_id = _texto(_campo(row, "id"))
+        except (ValueError, TypeError):
+            stats["invalidas"] = stats.get("invalidas", 0) + 1
+            continue
+        if sinal == "debito-negativo":
+            amount = -amount
+        if amount <= 0:
+            stats["creditos"] = stats.get("creditos", 0) + 1
+            continue
+        if tx_id is None:
+            # Sem id no extrato: gera um id estável para que reimportações não dupliquem
+            chave = f"{transacted_at}|{amount:.2f}|{description}"
+            tx_id = "imp_" + hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
+        yield {
+            "id": tx_id,
+            "amount": amount,
+            "category": category,
+            "transacted_at": transacted_at,
+            "description": description,
+        }
+
+
+def deduplicate(conn: sqlite3.Connection, bloco: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Registra os `id`s do bloco no índice e retorna só as transações novas. As
+    inserções ficam pendentes até o `commit` feito junto com a gravação do bloco.
+    """
+    novas = []
+    for tx in bloco:
+        if conn.execute("INSERT OR IGNORE INTO ids (id) VALUES (?)", (tx["id"],)).rowcount:
+            novas.append(tx)
+    return novas
+
+
+def chunked(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Agrupa um iterável em listas de até `size` elementos."""
+    iterator = iter(items)
+    while True:
+        bloco = list(islice(iterator, size))
+        if not bloco:
+            return
+        yield bloco
+
+
+def history_path(client_data_file: str, client_data: Dict[str, Any]) -> str:
+    """Caminho do histórico NDJSON do cliente (padrão: <client_data>.transacoes.ndjson)."""
+    if client_data.get("historico_transacoes"):
+        return os.path.join(os.path.dirname(os.path.abspath(client_data_file)), client_data["historico_transacoes"])
+    raiz, _ = os.path.splitext(client_data_file)
+    return f"{raiz}.transacoes.ndjson"
+
+
+def ids_path(historico: str) -> str:
+    """Caminho do índice de `id`s do histórico (<historico>.ids.sqlite)."""
+    raiz, _ = os.path.splitext(historico)
+    return f"{raiz}.ids.sqlite"
+
+
+def _build_id_index(historico: str, destino: str, chunk_size: int = 1000):
+    """
+    Indexa os `id`s de um histórico existente em `<destino>.tmp` e só depois do
+    `commit` substitui `destino`, para que um índice incompleto nunca seja usado.
+    Uma última linha sem quebra de linha (gravação interrompida) fica de fora do
+    offset confirmado.
+    """
+    temporario = destino + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    conn = sqlite3.connect(temporario)
+    try:
+        conn.execute("CREATE TABLE ids (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor INTEGER)")
+        offset = 0
+        if os.path.exists(historico):
+            ids: List[tuple] = []
+            with open(historico, "rb") as f:
+                for linha in f:
+                    if not linha.endswith(b"\n"):
+                        break
+                    if linha.strip():
+                        try:
+                            ids.append((json.loads(linha)["id"],))
+                        except (ValueError, KeyError, TypeError):
+                            raise RuntimeError(f"Linha inválida no histórico {historico} (byte {offset})")
+                    offset += len(linha)
+                    if len(ids) >= chunk_size:
+                        conn.executemany("INSERT OR IGNORE INTO ids (id) VALUES (?)", ids)
+                        ids = []
+            conn.executemany("INSERT OR IGNORE INTO ids (id) VALUES (?)", ids)
+        _set_offset(conn, offset)
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(temporario)
+        raise
+    conn.close()
+    os.replace(temporario, destino)
+
+
+def open_id_index(historico: str, chunk_size: int = 1000) -> sqlite3.Connection:
+    """
+    Abre o índice SQLite com os `id`s do histórico e o tamanho em bytes do histórico
+    já confirmado (`offset`).
+
+    Sem índice (ou com um índice sem offset confirmado), o histórico é indexado de
+    novo, em blocos. Se o histórico for maior que o `offset` confirmado (import
+    interrompido), o final não confirmado é descartado: os `id`s dessas linhas
+    também não foram confirmados e serão importados de novo.
+    """
+    caminho = ids_path(historico)
+    if os.path.exists(caminho):
+        conn = sqlite3.connect(caminho)
+        try:
+            offset = committed_offset(conn)
+        except sqlite3.DatabaseError:
+            offset = None
+        if offset is None:
+            # Índice incompleto: nunca trata como offset 0, reconstrói a partir do histórico
+            conn.close()
+            os.remove(caminho)
+    if not os.path.exists(caminho):
+        _build_id_index(historico, caminho, chunk_size)
+    conn = sqlite3.connect(caminho)
+    offset = committed_offset(conn)
+
+    tamanho = os.path.getsize(historico) if os.path.exists(historico) else 0
+    if offset is None or tamanho < offset:
+        conn.close()
+        raise RuntimeError(
+            f"O histórico {historico} é menor que o índice {caminho}; "
+            "apague o índice para reconstruí-lo a partir do histórico"
+        )
+    if tamanho > offset:
+        with open(historico, "r+b") as f:
+            f.truncate(offset)
+    return conn
+
+
+def committed_offset(conn: sqlite3.Connection) -> Optional[int]:
+    """Tamanho em bytes do histórico confirmado no índice (None se nunca foi confirmado)."""
+    linha = conn.execute("SELECT valor FROM meta WHERE chave = 'offset'").fetchone()
+    return linha[0] if linha else None
+
+
+def _set_offset(conn: sqlite3.Connection, offset: int):
+    conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('offset', ?)", (offset,))
+
+
+def append_chunk(conn: sqlite3.Connection, f, bloco: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Anexa ao histórico (aberto em modo "ab") as transações novas do bloco e confirma
+    os `id`s no índice junto com o novo offset. Retorna as transações novas.
+    """
+    novas = deduplicate(conn, bloco)
+    f.writelines((json.dumps(tx, ensure_ascii=False) + "\n").encode("utf-8") for tx in novas)
+    f.flush()
+    os.fsync(f.fileno())
+    _set_offset(conn, f.tell())
+    conn.commit()
+    return novas
+
+
+def open_history(historico: str, recentes: List[Dict[str, Any]], chunk_size: int = 1000) -> sqlite3.Connection:
+    """
+    Abre o índice de `id`s do histórico. No primeiro import o histórico é criado com
+    as transações que já estavam em `transacoes_recentes`.
+    """
+    primeiro_import = not os.path.exists(historico)
+    conn = open_id_index(historico, chunk_size)
+    if primeiro_import:
+        with open(historico, "ab") as f:
+            append_chunk(conn, f, recentes)
+    return conn
+
+
+def read_history(historico: str, inicio: int = 0, fim: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Percorre as transações do histórico NDJSON entre os bytes `inicio` e `fim`."""
+    with open(historico, "rb") as f:
+        f.seek(inicio)
+        posicao = inicio
+        for linha in f:
+            posicao += len(linha)
+            if fim is not None and posicao > fim:
+                return
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def sync_rollups(rollups: MonthlyRollups, cliente: str, historico: str, offset: int, chunk_size: int = 1000) -> int:
+    """
+    Soma aos totais mensais o trecho do histórico confirmado que ainda não entrou no
+    índice (entre o offset gravado em `rollups.json` e `offset`). Sem offset gravado
+    para o cliente, os totais são recalculados do zero. Retorna o número de transações somadas.
+    """
+    inicio = rollups.offsets.get(cliente)
+    if inicio is None or inicio > offset:
+        rollups.clientes.pop(cliente, None)
+        inicio = 0
+    total = 0
+    for bloco in chunked(read_history(historico, inicio, offset), chunk_size):
+        rollups.add(cliente, bloco)
+        total += len(bloco)
+    rollups.offsets[cliente] = offset
+    return total
+
+
+def rebuild_rollups(client_data_file: str = "client_data.json", chunk_size: int = 1000) -> int:
+    """Recalcula do zero os totais mensais do cliente a partir do histórico."""
+    with open(client_data_file, "r", encoding="utf-8") as f:
+        client_data = json.load(f)
+    historico = history_path(client_data_file, client_data)
+    conn = open_history(historico, client_data.get("transacoes_recentes", []), chunk_size)
+    try:
+        offset = committed_offset(conn)
+    finally:
+        conn.close()
+
+    arquivo = rollups_path(client_data_file)
+    rollups = MonthlyRollups.load(arquivo)
+    cliente = client_key(client_data)
+    rollups.offsets.pop(cliente, None)
+    total = sync_rollups(rollups, cliente, historico, offset, chunk_size)
+    rollups.save(arquivo)
+    return total
+
+
+def import_statement(
+    statement_file: str,
+    client_data_file: str = "client_data.json",
+    formato: Optional[str] = None,
+    chunk_size: int = 1000,
+    recent_count: int = 50,
+    sinal: str = "debito-negativo",
+) -> Dict[str, int]:
+    """
+    Importa um extrato para o histórico do cliente e atualiza `transacoes_recentes`
+    e os totais mensais em `rollups.json`.
+
+    Os totais são gravados a cada bloco junto com o offset do histórico que já
+    contabilizam; se um import for interrompido, o próximo soma o que faltou antes
+    de continuar.
+
+    Returns:
+        dict com o número de linhas lidas, transações importadas, duplicadas, créditos
+        ignorados e linhas inválidas.
+    """
+    formato = (formato or os.path.splitext(statement_file)[1].lstrip(".")).lower()
+    if formato not in LEITORES:
+        raise ValueError(f"Formato não suportado: {formato!r} (use csv, ndjson ou ofx)")
+
+    with open(client_data_file, "r", encoding="utf-8") as f:
+        client_data = json.load(f)
+    recentes = client_data.get("transacoes_recentes", [])
+
+    historico = history_path(client_data_file, client_data)
+    conn = open_history(historico, recentes, chunk_size)
+
+    arquivo_rollups = rollups_path(client_data_file)
+    rollups = MonthlyRollups.load(arquivo_rollups)
+    cliente = client_key(client_data)
+    sync_rollups(rollups, cliente, historico, committed_offset(conn), chunk_size)
+    rollups.save(arquivo_rollups)
+
+    # Mantém apenas as `recent_count` transações mais recentes (min-heap por data)
+    heap = [(tx["transacted_at"], i, tx) for i, tx in enumerate(recentes)]
+    heap = heapq.nlargest(recent_count, heap)
+    heapq.heapify(heap)
+    contador = len(recentes)
+
+    lidas = 0
+    importadas = 0
+    stats = {"creditos": 0, "invalidas": 0}
+
+    def contar(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal lidas
+        for row in rows:
+            lidas += 1
+            yield row
+
+    blocos = chunked(normalize_rows(contar(LEITORES[formato](statement_file)), sinal, stats), chunk_size)
+    try:
+        with open(historico, "ab") as f:
+            for bloco in blocos:
+                novas = append_chunk(conn, f, bloco)
+                importadas += len(novas)
+                # Totais e offset gravados juntos: o índice nunca conta linhas a mais nem a menos
+                rollups.add(cliente, novas)
+                rollups.offsets[cliente] = f.tell()
+                rollups.save(arquivo_rollups)
+                for tx in novas:
+                    contador += 1
+                    item = (tx["transacted_at"], contador, tx)
+                    if len(heap) < recent_count:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+    finally:
+        conn.close()
+
+    client_data["transacoes_recentes"] = [tx for _, _, tx in sorted(heap, reverse=True)]
+    client_data["historico_transacoes"] = os.path.relpath(
+        historico, os.path.dirname(os.path.abspath(client_data_file))
+    )
+
+    # Escreve em um arquivo temporário para não corromper os dados em caso de erro
+    temporario = client_data_file + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(client_data, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, client_data_file)
+
+    return {
+        "lidas": lidas,
+        "importadas": importadas,
+        "duplicadas": lidas - importadas - stats["creditos"] - stats["invalidas"],
+        "creditos": stats["creditos"],
+        "invalidas": stats["invalidas"],
+    }
+
+
+def _tamanho_bloco(texto: str) -> int:
+    valor = int(texto)
+    if valor < 1:
+        raise argparse.ArgumentTypeError("deve ser pelo menos 1")
+    return valor
+
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description="Importa extratos bancários para o Fin-Bot.")
+    parser.add_argument("extrato", nargs="?", help="Arquivo CSV, NDJSON ou OFX exportado do banco")
+    parser.add_argument("--client-data", default="client_data.json", help="Arquivo de dados do cliente")
+    parser.add_argument("--formato", choices=sorted(LEITORES), help="Formato do extrato (padrão: extensão do arquivo)")
+    parser.add_argument("--chunk-size", type=_tamanho_bloco, default=1000, help="Transações gravadas por bloco")
+    parser.add_argument("--sinal", choices=SINAIS, default="debito-negativo", help="Convenção de sinal dos valores (padrão: débitos negativos, como no OFX)")
+    parser.add_argument("--recentes", type=int, default=50, help="Quantidade mantida em transacoes_recentes")
+    parser.add_argument("--reconstruir-rollups", action="store_true", help="Recalcula os totais mensais a partir do histórico")
+    args = parser.parse_args()
+
+    if args.reconstruir_rollups:
+        total = rebuild_rollups(args.client_data, chunk_size=args.chunk_size)
+        print(f"📊 Totais mensais recalculados a partir de {total} transações")
+        if not args.extrato:
+            return
+    elif not args.extrato:
+        parser.error("informe o arquivo do extrato")
+
+    resultado = import_statement(
+        args.extrato,
+        client_data_file=args.client_data,
+        formato=args.formato,
+        chunk_size=args.chunk_size,
+        recent_count=args.recentes,
+        sinal=args.sinal,
+    )
+    print(f"📥 Linhas lidas: {resultado['lidas']}")
+    print(f"✅ Transações importadas: {resultado['importadas']}")
+    print(f"♻️ Duplicadas ignoradas: {resultado['duplicadas']}")
+    print(f"💵 Créditos ignorados: {resultado['creditos']}")
+    print(f"⚠️ Linhas inválidas ignoradas: {resultado['invalidas']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do servidor MCP do Fin-Bot.
+
+Abre várias sessões SSE (`ClientSession`) em paralelo contra o servidor, repete
+uma mistura configurável de chamadas a `help_template`, `surpresa_gastos` e
+`lembrete_emprestimo` e, no fim, mostra a vazão (chamadas/s) e as latências
+p50/p95/p99 de cada ferramenta.
+
+Por padrão o script sobe o `server.py` local e o encerra ao terminar. Use `--url`
+para testar um servidor que já está rodando.
+
+Uso:
+    python load_test.py --sessions 50 --duration 30
+    python load_test.py --mix help_template=1,surpresa_gastos=4 --transactions 2000 --columnar
+    python load_test.py --url http://localhost:3333/sse
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from columnar import to_columnar
+
+CATEGORIAS = ["Alimentação", "Transporte", "Lazer", "Saúde", "Educação", "Moradia"]
+FREQUENCIAS = ["DAILY", "WEEKLY", "FORTNIGHTLY", "MONTHLY", "BIMONTHLY", "QUARTERLY", "BIANNUALLY", "ANNUALLY"]
+MIX_PADRAO = "help_template=4,surpresa_gastos=4,lembrete_emprestimo=2"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Converte "ferramenta=peso,..." em um dicionário de pesos."""
+    pesos = {}
+    for parte in mix.split(","):
+        nome, _, peso = parte.partition("=")
+        pesos[nome.strip()] = float(peso or 1)
+    return pesos
+
+
+def build_transactions(n: int) -> List[Dict[str, Any]]:
+    """Gera `n` transações aleatórias nos últimos 30 dias, como em `create_client_data.py`."""
+    hoje = datetime.now()
+    return [
+        {
+            "id": f"tx_{i+1:06d}",
+            "amount": round(random.uniform(20, 300), 2),
+            "category": random.choice(CATEGORIAS),
+            "transacted_at": (hoje - timedelta(days=random.randint(0, 30), minutes=random.randint(0, 1440))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "description": f"Transação {i+1}",
+        }
+        for i in range(n)
+    ]
+
+
+def build_payloads(transactions: int, columnar: bool, variants: int = 8) -> Dict[str, List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Pré-gera alguns argumentos para cada ferramenta, para que o custo de montar os
+    payloads não entre na latência medida. Retorna {ferramenta: [(nome_mcp, args)]}.
+    """
+    payloads: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+        "help_template": [],
+        "surpresa_gastos": [],
+        "lembrete_emprestimo": [],
+    }
+    for _ in range(variants):
+        payloads["help_template"].append(("help_template", {
+            "balance_available": round(random.uniform(0, 10000), 2),
+            "last_month_amount": round(random.uniform(1000, 8000), 2),
+            "income": round(random.uniform(1000, 10000), 2),
+            "frequency": random.choice(FREQUENCIAS),
+        }))
+
+        # Tamanho do histórico varia em torno de `transactions` (±50%)
+        txs = build_transactions(max(1, int(transactions * random.uniform(0.5, 1.5))))
+        if columnar:
+            args = {**to_columnar(txs), "window_days": 7, "threshold_pct": 0.30}
+            payloads["surpresa_gastos"].append(("surpresa_gastos_colunar", args))
+        else:
+            payloads["surpresa_gastos"].append(("surpresa_gastos", {"transactions": txs, "window_days": 7, "threshold_pct": 0.30}))
+
+        payloads["lembrete_emprestimo"].append(("lembrete_emprestimo", {
+            "next_payment_date": (datetime.now() + timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d"),
+            "minimum_installment_amount": round(random.uniform(100, 2000), 2),
+            "installments_outstanding": random.randint(1, 60),
+            "interest_rate": round(random.uniform(0.005, 0.05), 4),
+            "extra_amount": round(random.uniform(10, 500), 2),
+        }))
+    return payloads
+
+
+def percentile(valores: List[float], p: float) -> float:
+    """Percentil pelo método nearest-rank (`valores` já ordenados)."""
+    if not valores:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[k]
+
+
+class LoadTest:
+    def __init__(self, url: str, sessions: int, duration: float, mix: Dict[str, float], payloads: Dict[str, List[Tuple[str, Dict[str, Any]]]], ramp_up: float = 0.0):
+        self.url = url
+        self.sessions = sessions
+        self.duration = duration
+        self.ferramentas = list(mix)
+        self.pesos = [mix[f] for f in self.ferramentas]
+        self.payloads = payloads
+        self.ramp_up = ramp_up
+        self.latencias: Dict[str, List[float]] = {f: [] for f in self.ferramentas}
+        self.erros: Dict[str, int] = {f: 0 for f in self.ferramentas}
+        self.conexoes: List[float] = []
+        # (início da primeira chamada, fim da última, chamadas bem-sucedidas por ferramenta) de cada sessão
+        self.janelas: List[Tuple[float, float, Dict[str, int]]] = []
+
+    async def _session(self, n: int, deadline: float):
+        """Uma sessão MCP que chama ferramentas em sequência até o `deadline`."""
+        if self.ramp_up:
+            await asyncio.sleep(self.ramp_up * n / self.sessions)
+        inicio = time.perf_counter()
+        try:
+            async with sse_client(self.url) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    inicio_chamadas = time.perf_counter()
+                    self.conexoes.append(inicio_chamadas - inicio)
+                    chamadas = {f: 0 for f in self.ferramentas}
+                    while time.perf_counter() < deadline:
+                        ferramenta = random.choices(self.ferramentas, self.pesos)[0]
+                        nome, args = random.choice(self.payloads[ferramenta])
+                        t0 = time.perf_counter()
+                        try:
+                            result = await session.call_tool(nome, args)
+                            if result.isError:
+                                self.erros[ferramenta] += 1
+                                continue
+                        except Exception:
+                            self.erros[ferramenta] += 1
+                            continue
+                        self.latencias[ferramenta].append(time.perf_counter() - t0)
+                        chamadas[ferramenta] += 1
+                    # Janela só com chamadas: sem ramp-up, conexão SSE nem encerramento da sessão
+                    self.janelas.append((inicio_chamadas, time.perf_counter(), chamadas))
+        except Exception as e:
+            print(f"❌ Sessão {n}: {e}")
+
+    async def run(self) -> float:
+        """Executa o teste e retorna o tempo total em segundos."""
+        inicio = time.perf_counter()
+        deadline = inicio + self.ramp_up + self.duration
+        await asyncio.gather(*(self._session(n, deadline) for n in range(self.sessions)))
+        return time.perf_counter() - inicio
+
+    def call_span(self) -> float:
+        """Segundos entre o início das chamadas na primeira sessão e o fim da última chamada."""
+        if not self.janelas:
+            return 0.0
+        return max(fim for _, fim, _ in self.janelas) - min(inicio for inicio, _, _ in self.janelas)
+
+    def throughput(self, ferramenta: Optional[str] = None) -> float:
+        """
+        Chamadas bem-sucedidas por segundo, dividindo o total de todas as sessões pelo
+        intervalo de `call_span()`. Sessões que não se sobrepõem não inflam a vazão.
+        """
+        intervalo = self.call_span()
+        if intervalo <= 0:
+            return 0.0
+        total = sum(chamadas[ferramenta] if ferramenta else sum(chamadas.values()) for _, _, chamadas in self.janelas)
+        return total / intervalo
+
+    def report(self, elapsed: float):
+        """Imprime vazão e latências por ferramenta."""
+        print("\n📈 RESULTADO DO TESTE DE CARGA")
+        print("=" * 78)
+        print(f"Sessões: {len(self.conexoes)}/{self.sessions} conectadas  |  Duração: {elapsed:.1f}s  |  Chamadas/s em {self.call_span():.1f}s (1ª chamada → última)")
+        if self.conexoes:
+            conexoes = sorted(self.conexoes)
+            print(f"Conexão (ms): p50 {percentile(conexoes, 50) * 1000:.1f}  p95 {percentile(conexoes, 95) * 1000:.1f}  p99 {percentile(conexoes, 99) * 1000:.1f}")
+        print("-" * 78)
+        print(f"{'Ferramenta':<22}{'Chamadas':>10}{'Erros':>8}{'Chamadas/s':>12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+        todas: List[float] = []
+        for ferramenta in self.ferramentas:
+            lat = sorted(self.latencias[ferramenta])
+            todas.extend(lat)
+            self._linha(ferramenta, lat, self.erros[ferramenta], self.throughput(ferramenta))
+        print("-" * 78)
+        self._linha("TOTAL", sorted(todas), sum(self.erros.values()), self.throughput())
+
+    @staticmethod
+    def _linha(nome: str, lat: List[float], erros: int, vazao: float):
+        print(
+            f"{nome:<22}{len(lat):>10}{erros:>8}{vazao:>12.1f}"
+            f"{percentile(lat, 50) * 1000:>9.1f}{percentile(lat, 95) * 1000:>9.1f}{percentile(lat, 99) * 1000:>9.1f}"
+        )
+
+
+def start_server(host: str, port: int, timeout: float = 15.0) -> subprocess.Popen:
+    """
+    Sobe o `server.py` local e espera a porta aceitar conexões. Falha se a porta já
+    estiver em uso, para não medir outro processo sem perceber. O stderr do servidor
+    continua no terminal com nível WARNING, para que erros de inicialização apareçam.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            pass
+    except OSError:
+        pass
+    else:
+        raise RuntimeError(
+            f"A porta {port} já está em uso em {host}. Encerre o outro processo "
+            f"ou use --url http://{host}:{port}/sse para testar o servidor que já está rodando"
+        )
+
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.Popen(
+        [sys.executable, os.path.join(pasta, "server.py")],
+        cwd=pasta,
+        stdout=subprocess.DEVNULL,
+        # Sem o log INFO de cada CallToolRequest, que inundaria o terminal durante o teste
+        env={**os.environ, "FASTMCP_LOG_LEVEL": "WARNING"},
+    )
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"server.py terminou com código {processo.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f"server.py não respondeu em {host}:{port} após {timeout:.0f}s")
+
+
+async def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor MCP do Fin-Bot.")
+    parser.add_argument("--url", help="URL SSE de um servidor já rodando (padrão: sobe o server.py local)")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessões MCP simultâneas")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração do teste em segundos")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Segundos para abrir todas as sessões")
+    parser.add_argument("--mix", default=MIX_PADRAO, help=f"Pesos das ferramentas (padrão: {MIX_PADRAO})")
+    parser.add_argument("--transactions", type=int, default=200, help="Tamanho médio do histórico enviado a surpresa_gastos")
+    parser.add_argument("--columnar", action="store_true", help="Usa surpresa_gastos_colunar no lugar de surpresa_gastos")
+    parser.add_argument("--seed", type=int, help="Semente para os payloads aleatórios")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    desconhecidas = set(mix) - {"help_template", "surpresa_gastos", "lembrete_emprestimo"}
+    if desconhecidas:
+        parser.error(f"Ferramentas desconhecidas no --mix: {', '.join(sorted(desconhecidas))}")
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    payloads = build_payloads(args.transactions, args.columnar)
+
+    processo: Optional[subprocess.Popen] = None
+    url = args.url
+    if not url:
+        try:
+            processo = start_server("localhost", 3333)
+        except RuntimeError as e:
+            parser.exit(1, f"❌ {e}\n")
+        url = "http://localhost:3333/sse"
+
+    try:
+        print(f"🚀 {args.sessions} sessões por {args.duration:.0f}s contra {url}")
+        teste = LoadTest(url, args.sessions, args.duration, mix, payloads, ramp_up=args.ramp_up)
+        elapsed = await teste.run()
+        teste.report(elapsed)
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
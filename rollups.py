@@ -0,0 +1,126 @@
+"""
+Índice de gastos mensais por cliente e categoria.
+
+Guarda, para cada cliente, o total gasto em cada mês ("YYYY-MM") por categoria:
+
+    {"clientes": {"Pedro Santos": {"2025-01": {"Saúde": 800.0, "Transporte": 450.0}}},
+     "offsets": {"Pedro Santos": 1234}}
+
+O índice é atualizado de forma incremental pelo `import_statements.py` a cada bloco
+de transações importadas. `offsets` guarda até que byte do histórico NDJSON de cada
+cliente os totais já foram somados, para que um import interrompido seja completado
+no próximo. O servidor MCP o consulta em `help_template` e
+`tendencia_gastos` sem precisar percorrer o histórico bruto.
+"""
+
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+ROLLUPS_FILE = "rollups.json"
+
+
+def rollups_path(client_data_file: str) -> str:
+    """Caminho do índice de totais mensais (`rollups.json` ao lado de client_data.json)."""
+    return os.path.join(os.path.dirname(os.path.abspath(client_data_file)), ROLLUPS_FILE)
+
+
+def client_key(client_data: Dict[str, Any]) -> str:
+    """Identificador do cliente no índice: `cliente.id` se existir, senão o nome."""
+    cliente = client_data.get("cliente", {})
+    return str(cliente.get("id") or cliente.get("nome") or "cliente")
+
+
+def month_of(transacted_at: str) -> str:
+    """Mês ("YYYY-MM") em UTC de um `transacted_at` ISO (sem fuso é considerado UTC)."""
+    dt = datetime.fromisoformat(transacted_at)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m")
+
+
+def shift_month(month: str, delta: int) -> str:
+    """Soma `delta` meses a um mês "YYYY-MM"."""
+    ano, mes = map(int, month.split("-"))
+    total = ano * 12 + (mes - 1) + delta
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def current_month(today: Optional[date] = None) -> str:
+    """Mês atual em UTC, o mesmo fuso usado em `transacted_at`."""
+    return (today or datetime.now(timezone.utc).date()).strftime("%Y-%m")
+
+
+def _pct(atual: float, anterior: Optional[float]) -> Optional[float]:
+    if not anterior:
+        return None
+    return round((atual / anterior - 1) * 100, 1)
+
+
+class MonthlyRollups:
+    def __init__(self, clientes: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None, offsets: Optional[Dict[str, int]] = None):
+        self.clientes: Dict[str, Dict[str, Dict[str, float]]] = clientes or {}
+        self.offsets: Dict[str, int] = offsets or {}
+
+    @classmethod
+    def load(cls, path: str = ROLLUPS_FILE) -> "MonthlyRollups":
+        """Carrega o índice do arquivo (índice vazio se o arquivo não existir)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            return cls(dados.get("clientes", {}), dados.get("offsets", {}))
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path: str = ROLLUPS_FILE):
+        """Grava o índice em um arquivo temporário e substitui o original."""
+        temporario = path + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"clientes": self.clientes, "offsets": self.offsets}, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temporario, path)
+
+    def has_client(self, client_id: str) -> bool:
+        return client_id in self.clientes
+
+    def add(self, client_id: str, transactions: Iterable[Dict[str, Any]]):
+        """Soma as transações aos totais do mês/categoria. Não remove duplicadas."""
+        meses = self.clientes.setdefault(client_id, {})
+        for tx in transactions:
+            categorias = meses.setdefault(month_of(tx["transacted_at"]), {})
+            categorias[tx["category"]] = round(categorias.get(tx["category"], 0.0) + tx["amount"], 2)
+
+    def month_total(self, client_id: str, month: str) -> Optional[float]:
+        """Total gasto no mês, ou None se o índice não tem dados do cliente nesse mês."""
+        categorias = self.clientes.get(client_id, {}).get(month)
+        if categorias is None:
+            return None
+        return round(sum(categorias.values()), 2)
+
+    def trend(self, client_id: str, months: int = 6, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Evolução mês a mês dos últimos `months` meses até `until` (inclusive).
+
+        Cada item traz o total do mês, a variação percentual em relação ao mês
+        anterior e os valores por categoria com a respectiva variação.
+        """
+        meses = self.clientes.get(client_id, {})
+        until = until or current_month()
+        resultado = []
+        anterior = meses.get(shift_month(until, -months), {})
+        for i in range(months - 1, -1, -1):
+            mes = shift_month(until, -i)
+            categorias = meses.get(mes, {})
+            total = round(sum(categorias.values(), 0.0), 2)
+            total_anterior = round(sum(anterior.values(), 0.0), 2)
+            resultado.append({
+                "month": mes,
+                "total": total,
+                "change_pct": _pct(total, total_anterior),
+                "categories": {
+                    cat: {"amount": valor, "change_pct": _pct(valor, anterior.get(cat))}
+                    for cat, valor in sorted(categorias.items())
+                },
+            })
+            anterior = categorias
+        return resultado
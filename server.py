@@ -1,20 +1,81 @@
+import os
 from mcp.server.fastmcp import FastMCP
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from itertools import accumulate
+from typing import List, Dict, Any, Optional
 
+from columnar import EPOCH
+from rollups import MonthlyRollups, current_month, rollups_path, shift_month
+
+
+# O FastMCP não lê FASTMCP_LOG_LEVEL quando log_level é passado no construtor
+mcp = FastMCP("HelpTemplateServer", host="0.0.0.0", port=3333, log_level=os.getenv("FASTMCP_LOG_LEVEL", "INFO").upper())
+
+# Mesmo caminho usado pelo import_statements.py: rollups.json ao lado de client_data.json
+CLIENT_DATA_FILE = os.getenv("FINBOT_CLIENT_DATA", "client_data.json")
+ROLLUPS_PATH = os.getenv("FINBOT_ROLLUPS_FILE") or rollups_path(CLIENT_DATA_FILE)
+_rollups_cache: Dict[str, Any] = {"mtime": None, "index": MonthlyRollups()}
+
+def _rollups() -> MonthlyRollups:
+    """Índice de totais mensais, recarregado só quando o arquivo muda (ex: após um import)."""
+    try:
+        mtime = os.path.getmtime(ROLLUPS_PATH)
+    except OSError:
+        mtime = None
+    if mtime != _rollups_cache["mtime"]:
+        _rollups_cache["index"] = MonthlyRollups.load(ROLLUPS_PATH)
+        _rollups_cache["mtime"] = mtime
+    return _rollups_cache["index"]
+
+def _detecta_surpresas(gastos_por_cat: Dict[str, Dict[Any, float]], data_mais_recente: Any, threshold_pct: float) -> List[Dict[str, Any]]:
+    """
+    Gera os alertas a partir dos gastos da janela agrupados por categoria e dia.
+    Compartilhado por `surpresa_gastos` e `surpresa_gastos_colunar`.
+    """
+    # 4) calcula média diária de cada categoria (excluindo o dia mais recente)
+    # Mínimo de 3 gastos para análise estatística confiável
+    media_diaria: Dict[str, float] = {}
+    for cat, dias in gastos_por_cat.items():
+        # Remove o dia mais recente do cálculo da média
+        dias_sem_recente = {d: v for d, v in dias.items() if d < data_mais_recente}
+        
+        # Só calcula média se tiver pelo menos 3 gastos históricos
+        if len(dias_sem_recente) >= 3:
+            media_diaria[cat] = sum(dias_sem_recente.values()) / len(dias_sem_recente)
+        # Se tiver menos de 3 gastos, ignora a categoria (não há dados suficientes para análise)
+
+    # 5) analisa todos os gastos de cada categoria para detectar surpresas
+    alertas = []
+    for cat, dias in gastos_por_cat.items():
+        media = media_diaria.get(cat, 0)
+        if not media:  # Pula se não tem média (menos de 3 gastos históricos)
+            continue
+            
+        # Analisa cada dia para detectar gastos acima da média
+        for dia, valor in dias.items():
+            if valor > media * (1 + threshold_pct):
+                alertas.append({
+                    "category": cat,
+                    "spent_amount": round(valor, 2),
+                    "daily_avg": round(media, 2),
+                    "pct_over": round((valor / media - 1) * 100, 1),
+                    "date": dia.strftime("%Y-%m-%d"),
+                })
+
+    return alertas
 
-mcp = FastMCP("HelpTemplateServer", host="0.0.0.0", port=3333)
 
 @mcp.tool(name="help_template", title="Gera template de ajuda financeira")
-async def help_template_tool(balance_available: float, last_month_amount: float, income: float, frequency: str) -> dict:
+async def help_template_tool(balance_available: float, income: float, frequency: str, last_month_amount: Optional[float] = None, client_id: Optional[str] = None) -> dict:
     """
     Gera um template de ajuda financeira com base no saldo disponível, o valor gasto no mês passado, o rendimento com base na frequência de pagamento.
 
     Args:
         balance_available: float - Saldo disponível
-        last_month_amount: float - Valor gasto no mês passado
         income: float - Rendimento com base na frequência de pagamento
         frequency: str - Frequência de pagamento
+        last_month_amount: float - Valor gasto no mês passado. Usado só se o índice de gastos mensais não tiver o mês passado do cliente.
+        client_id: str - Identificador do cliente (`cliente.id` em client_data.json, ou `cliente.nome` se não houver id). Se informado, o gasto do mês passado vem do índice de gastos mensais.
     
     frequency:
         DAILY: 30 (30 dias)
@@ -28,7 +89,15 @@ async def help_template_tool(balance_available: float, last_month_amount: float,
 
     Returns:
         dict - Dicionário com a chave "over_expenses" contendo um booleano indicando se o saldo disponível é suficiente para cobrir os gastos do mês. Se over_expenses for False, o saldo disponível é suficiente para cobrir os gastos deste mês se o cliente continuar a gastar como no mês passado.
+        A chave "last_month_amount" traz o valor do mês passado usado no cálculo.
     """
+    if client_id:
+        do_indice = _rollups().month_total(client_id, shift_month(current_month(), -1))
+        if do_indice is not None:
+            last_month_amount = do_indice
+    if last_month_amount is None:
+        raise ValueError("Informe last_month_amount ou um client_id com gastos do mês passado no índice")
+
     factor = {
         "DAILY": 30,
         "WEEKLY": 4,
@@ -42,8 +111,30 @@ async def help_template_tool(balance_available: float, last_month_amount: float,
     multi = factor.get(frequency, 1)
     month_income = income * multi
     if balance_available is not None and month_income:
-        return {"over_expenses": (month_income - last_month_amount) < 0}
-    return {"over_expenses": False}
+        return {"over_expenses": (month_income - last_month_amount) < 0, "last_month_amount": last_month_amount}
+    return {"over_expenses": False, "last_month_amount": last_month_amount}
+
+@mcp.tool(name="tendencia_gastos", title="Tendência de gastos mês a mês")
+async def tendencia_gastos_tool(client_id: str, months: int = 6, until_month: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Mostra a evolução dos gastos do cliente mês a mês, no total e por categoria, a partir do índice de gastos mensais.
+
+    Args:
+        client_id: str - Identificador do cliente (`cliente.id` em client_data.json, ou `cliente.nome` se não houver id)
+        months: int - Quantidade de meses analisados
+        until_month: str - Último mês da análise no formato "YYYY-MM" (padrão: mês atual)
+
+    Returns:
+        Dict[str, Any] - Dicionário com a chave "months" contendo, do mais antigo para o mais recente:
+            - month: mês ("YYYY-MM")
+            - total: total gasto no mês
+            - change_pct: variação percentual em relação ao mês anterior (None se o anterior for zero)
+            - categories: {categoria: {"amount": valor, "change_pct": variação}}
+    """
+    indice = _rollups()
+    if not indice.has_client(client_id):
+        raise ValueError(f"Cliente {client_id!r} não encontrado no índice de gastos mensais")
+    return {"months": indice.trend(client_id, months, until_month)}
 
 @mcp.tool(name="surpresa_gastos", title="Sinaliza Gastos “Surpresa”")
 async def surpresa_gastos_tool(transactions: List[Dict[str, Any]], window_days: int = 7, threshold_pct: float = 0.30) -> Dict[str, Any]:
@@ -89,37 +180,62 @@ async def surpresa_gastos_tool(transactions: List[Dict[str, Any]], window_days:
             gastos_por_cat.setdefault(tx["category"], {}).setdefault(dt, 0.0) # type: ignore
             gastos_por_cat[tx["category"]][dt] += tx["amount"] # type: ignore
 
-    # 4) calcula média diária de cada categoria (excluindo o dia mais recente)
-    # Mínimo de 3 gastos para análise estatística confiável
-    media_diaria: Dict[str, float] = {}
-    for cat, dias in gastos_por_cat.items():
-        # Remove o dia mais recente do cálculo da média
-        dias_sem_recente = {d: v for d, v in dias.items() if d < data_mais_recente}
-        
-        # Só calcula média se tiver pelo menos 3 gastos históricos
-        if len(dias_sem_recente) >= 3:
-            media_diaria[cat] = sum(dias_sem_recente.values()) / len(dias_sem_recente)
-        # Se tiver menos de 3 gastos, ignora a categoria (não há dados suficientes para análise)
+    return {"alerts": _detecta_surpresas(gastos_por_cat, data_mais_recente, threshold_pct)}
 
-    # 5) analisa todos os gastos de cada categoria para detectar surpresas
-    alertas = []
-    for cat, dias in gastos_por_cat.items():
-        media = media_diaria.get(cat, 0)
-        if not media:  # Pula se não tem média (menos de 3 gastos históricos)
-            continue
-            
-        # Analisa cada dia para detectar gastos acima da média
-        for dia, valor in dias.items():
-            if valor > media * (1 + threshold_pct):
-                alertas.append({
-                    "category": cat,
-                    "spent_amount": round(valor, 2),
-                    "daily_avg": round(media, 2),
-                    "pct_over": round((valor / media - 1) * 100, 1),
-                    "date": dia.strftime("%Y-%m-%d"),
-                })
+@mcp.tool(name="surpresa_gastos_colunar", title="Sinaliza Gastos “Surpresa” (formato colunar)")
+async def surpresa_gastos_colunar_tool(categories: List[str], category_idx: List[int], amounts: List[float], days: List[int], delta_encoded: bool = False, window_days: int = 7, threshold_pct: float = 0.30) -> Dict[str, Any]:
+    """
+    Mesma análise de `surpresa_gastos`, mas recebendo as transações em listas paralelas.
+    Recomendado para históricos grandes: o payload e a validação ficam bem menores.
+
+    Args:
+        categories: List[str] - Dicionário de categorias (nomes sem repetição)
+        category_idx: List[int] - Índice da categoria de cada transação em `categories`
+        amounts: List[float] - Valor de cada transação
+        days: List[int] - Data de cada transação em dias desde 1970-01-01
+        delta_encoded: bool - Se True, `days[0]` é absoluto e os demais são a diferença para o anterior
+        window_days: int - Número de dias para o cálculo da média diária
+        threshold_pct: float - Percentual de tolerância para o cálculo da média diária
+
+    Exemplo (2025-01-01, 2025-01-01 e 2025-01-02):
+        categories: ["Alimentação", "Transporte"]
+        category_idx: [0, 1, 0]
+        amounts: [120.0, 450.0, 90.0]
+        days: [20089, 0, 1]
+        delta_encoded: true
+
+    Returns:
+        Dict[str, Any] - Dicionário com a chave "alerts" contendo uma lista de alertas.
+    """
+    if not (len(category_idx) == len(amounts) == len(days)):
+        raise ValueError("category_idx, amounts e days devem ter o mesmo tamanho")
+    if category_idx and not (0 <= min(category_idx) and max(category_idx) < len(categories)):
+        raise ValueError(f"category_idx deve estar entre 0 e {len(categories) - 1} (índices em categories)")
+    if not days:
+        return {"alerts": []}
+
+    # 1) reconstrói os dias absolutos e encontra o mais recente
+    dias_abs = list(accumulate(days)) if delta_encoded else days
+    dia_mais_recente = max(dias_abs)
+    inicio = dia_mais_recente - (window_days - 1)
+
+    # 2) agrupa valores por categoria e dia direto das listas, sem montar dicts por transação
+    gastos_por_dia: Dict[int, Dict[int, float]] = {}
+    for idx, valor, dia in zip(category_idx, amounts, dias_abs):
+        if inicio <= dia <= dia_mais_recente:
+            por_dia = gastos_por_dia.setdefault(idx, {})
+            por_dia[dia] = por_dia.get(dia, 0.0) + valor
+
+    # 3) converte só os dias da janela para datas
+    gastos_por_cat: Dict[str, Dict[Any, float]] = {}
+    for idx, por_dia in gastos_por_dia.items():
+        dias_cat = gastos_por_cat.setdefault(categories[idx], {})
+        for dia, valor in por_dia.items():
+            data = EPOCH + timedelta(days=dia)
+            dias_cat[data] = dias_cat.get(data, 0.0) + valor
 
-    return {"alerts": alertas}
+    data_mais_recente = EPOCH + timedelta(days=dia_mais_recente)
+    return {"alerts": _detecta_surpresas(gastos_por_cat, data_mais_recente, threshold_pct)}
 
 @mcp.tool(name="lembrete_emprestimo", title="Lembrete & Turbo na Parcela do Empréstimo")
 async def lembrete_emprestimo_tool(next_payment_date: str, minimum_installment_amount: float, installments_outstanding: int, interest_rate: float, extra_amount: float) -> dict: